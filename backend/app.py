@@ -8,7 +8,7 @@ import json
 import os
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from mcq_generator import mcq_agent, extract_text_from_pdf, Runner
+from mcq_generator import mcq_agent, extract_text_from_pdf, Runner, MODEL_NAME, response_cache, json_loads, extract_json_payload, is_blank
 from rag_engine import RAGEngine
 
 import models, schemas, auth
@@ -34,8 +34,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-instruction_template = mcq_agent.instructions
-
 # --- AUTH ENDPOINTS ---
 
 @app.post("/auth/signup", response_model=schemas.User)
@@ -130,7 +128,7 @@ async def generate_mcqs(
         content = extract_text_from_pdf(temp_filepath)
         os.remove(temp_filepath)
 
-        if not content.strip():
+        if is_blank(content):
             print("Could not extract text from the PDF.")
             return {"error": "Could not extract text from the PDF."}
 
@@ -146,26 +144,33 @@ async def generate_mcqs(
             print("Retrieving diverse context...")
             context = rag_engine.get_diverse_context()
 
-        # Use the agent to generate MCQs
-        print(f"Generating {num_questions} MCQs via Agent...")
-        mcq_agent.instructions = instruction_template.format(num_questions=num_questions)
-        prompt = f"Difficulty: {difficulty}\n\nCONTEXT:\n{context}"
-        
-        # Use Runner.run for async
-        result = await Runner.run(mcq_agent, prompt)
-        
-        if result and result.final_output:
+        # Check the response cache before calling the model
+        raw_output = response_cache.get(MODEL_NAME, difficulty, context, num_questions=num_questions)
+        from_cache = raw_output is not None
+        if from_cache:
+            print("Found cached MCQs for this context, skipping the model call.")
+        else:
+            # Use the agent to generate MCQs; the variable context goes last
+            # so the stable part of the request stays cacheable
+            print(f"Generating {num_questions} MCQs via Agent...")
+            prompt = f"Generate exactly {num_questions} MCQs.\nDifficulty: {difficulty}\n\nCONTEXT:\n{context}"
+
+            # Use Runner.run for async
+            result = await Runner.run(mcq_agent, prompt)
+            if result and result.final_output:
+                raw_output = result.final_output
+
+        if raw_output:
             try:
-                # Clean and parse the JSON output
-                clean_text = result.final_output.strip()
-                if clean_text.startswith("```json"):
-                    clean_text = clean_text[7:]
-                if clean_text.strip().endswith("```"):
-                    clean_text = clean_text.strip()[:-3]
-                
+                # Isolate and parse the JSON output
+                clean_text = extract_json_payload(raw_output)
                 print(f"Successfully generated MCQs: {clean_text[:100]}...")
-                mcqs_json = json.loads(clean_text)
-                
+                mcqs_json = json_loads(clean_text)
+
+                # Cache only responses that parsed cleanly
+                if not from_cache:
+                    response_cache.put(MODEL_NAME, difficulty, context, raw_output, num_questions=num_questions)
+
                 # Save Quiz to Database
                 new_quiz = models.Quiz(
                     user_id=current_user.id,
@@ -198,7 +203,10 @@ async def generate_mcqs(
                 
             except json.JSONDecodeError as e:
                 print(f"Failed to parse the generated MCQs: {e}")
-                print(f"Raw output: {result.final_output}")
+                print(f"Raw output: {raw_output}")
+                if from_cache:
+                    # Evict the unparseable entry so retries regenerate
+                    response_cache.delete(MODEL_NAME, difficulty, context, num_questions=num_questions)
                 raise HTTPException(status_code=500, detail=f"Failed to parse the generated MCQs: {str(e)}")
         
         print("Failed to generate MCQs from Agent.")
@@ -1,7 +1,41 @@
+import io
 import os
 import argparse
+import asyncio
+import hashlib
 import json
+import threading
+from functools import lru_cache
 import PyPDF2
+from concurrent.futures import ProcessPoolExecutor
+
+# Native PDF extractors, fastest first: zpdf (Zig bindings, not on PyPI
+# for every platform so purely opt-in), then pypdfium2 (Google PDFium
+# bindings, C-backed and several times faster than PyPDF2). PyPDF2 remains
+# the pure-Python fallback.
+try:
+    import zpdf
+except ImportError:
+    zpdf = None
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# orjson parses model responses several times faster than the stdlib; its
+# JSONDecodeError subclasses json.JSONDecodeError so callers catch either.
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# ijson decodes array items one at a time, so formatting and writing MCQs
+# overlaps parsing instead of waiting for the whole document.
+try:
+    import ijson
+except ImportError:
+    ijson = None
 from dotenv import load_dotenv
 from agents import (
     Agent, 
@@ -11,56 +45,261 @@ from agents import (
     set_default_openai_api,
     set_tracing_disabled
 )
+from response_cache import ResponseCache, CACHE_DIR
 
 # Load environment variables (expects OPENROUTER_API_KEY in .env)
 load_dotenv(override=True)
 
 # --- STEP 1: UTILITIES ---
-def extract_text_from_pdf(pdf_filepath: str) -> str:
-    text = ""
+
+def is_blank(text: str) -> bool:
+    """True when text is empty or all whitespace. str.isspace scans in C
+    without building the stripped copy that text.strip() would allocate,
+    which matters when the text is a whole extracted document."""
+    return not text or text.isspace()
+
+# Documents below this page count are extracted sequentially; forking worker
+# processes costs more than it saves on small PDFs.
+PARALLEL_PAGE_THRESHOLD = 8
+
+# The prompt only ever sees this many characters of chapter text.
+PROMPT_CHAR_BUDGET = 8000
+
+# On-disk cache of extracted PDF text, keyed by file identity
+PDF_TEXT_CACHE_DIR = os.path.join(CACHE_DIR, "pdftext")
+
+def _pdf_cache_paths(pdf_filepath: str):
+    digest = hashlib.sha1(os.path.abspath(pdf_filepath).encode("utf-8")).hexdigest()
+    base = os.path.join(PDF_TEXT_CACHE_DIR, digest)
+    return base + ".txt", base + ".meta"
+
+def _extract_page_text(task) -> str:
+    """Worker for parallel extraction. Reopens the file and extracts a single
+    page, since PyPDF2 reader objects cannot be pickled across processes."""
+    pdf_filepath, page_index = task
+    try:
+        with open(pdf_filepath, 'rb') as f:
+            page = PyPDF2.PdfReader(f).pages[page_index]
+            return page.extract_text() or ""
+    except Exception as e:
+        print(f"Error extracting page {page_index}: {e}")
+        return ""
+
+def extract_text_from_pdf(pdf_filepath: str, parallel: bool = False, max_chars: int = None) -> str:
+    """Extracts text from a PDF, stopping early once max_chars characters
+    have been accumulated (None extracts the whole document).
+
+    Results are memoized on disk keyed by (path, mtime, size, max_chars),
+    so re-running on an unchanged file (e.g. at a different difficulty)
+    skips parsing entirely."""
+    text_path, meta_path = _pdf_cache_paths(pdf_filepath)
+    meta = None
+    try:
+        st = os.stat(pdf_filepath)
+        meta = f"{st.st_mtime_ns}|{st.st_size}|{max_chars}"
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as mf:
+                if mf.read() == meta:
+                    with open(text_path, 'r', encoding='utf-8') as tf:
+                        return tf.read()
+    except Exception as e:
+        print(f"Warning: PDF text cache lookup failed: {e}")
+        meta = None
+
+    text = _extract_pdf_text(pdf_filepath, parallel=parallel, max_chars=max_chars)
+
+    if meta is not None and text:
+        try:
+            os.makedirs(PDF_TEXT_CACHE_DIR, exist_ok=True)
+            # Write-then-rename so a crash never leaves a torn cache entry
+            with open(text_path + ".tmp", 'w', encoding='utf-8') as tf:
+                tf.write(text)
+            os.replace(text_path + ".tmp", text_path)
+            with open(meta_path + ".tmp", 'w', encoding='utf-8') as mf:
+                mf.write(meta)
+            os.replace(meta_path + ".tmp", meta_path)
+        except Exception as e:
+            print(f"Warning: could not write PDF text cache: {e}")
+    return text
+
+def _extract_pdf_text(pdf_filepath: str, parallel: bool = False, max_chars: int = None) -> str:
+    if zpdf is not None:
+        try:
+            with zpdf.Document(pdf_filepath) as doc:
+                text = doc.extract_all()
+            return text[:max_chars] if max_chars is not None else text
+        except Exception as e:
+            print(f"Error extracting PDF with zpdf, falling back: {e}")
+
+    if pdfium is not None:
+        try:
+            pdf = pdfium.PdfDocument(pdf_filepath)
+            try:
+                parts = []
+                total = 0
+                for page in pdf:
+                    part = page.get_textpage().get_text_range()
+                    parts.append(part)
+                    total += len(part) + 1
+                    if max_chars is not None and total >= max_chars:
+                        break
+                return "\n".join(parts)
+            finally:
+                pdf.close()
+        except Exception as e:
+            print(f"Error extracting PDF with pypdfium2, falling back to PyPDF2: {e}")
+
     try:
         with open(pdf_filepath, 'rb') as f:
             reader = PyPDF2.PdfReader(f)
+            num_pages = len(reader.pages)
+            if parallel and num_pages >= PARALLEL_PAGE_THRESHOLD:
+                if max_chars is None:
+                    page_limit = num_pages
+                else:
+                    # Fan out only the prefix of pages the cap can plausibly
+                    # need, assuming a conservative 500 chars per page; any
+                    # shortfall from sparse pages is topped up sequentially.
+                    page_limit = min(num_pages,
+                                     max(PARALLEL_PAGE_THRESHOLD, max_chars // 500))
+                tasks = [(pdf_filepath, i) for i in range(page_limit)]
+                with ProcessPoolExecutor() as executor:
+                    parts = list(executor.map(_extract_page_text, tasks))
+                total = sum(len(part) + 1 for part in parts)
+                for i in range(page_limit, num_pages):
+                    if max_chars is not None and total >= max_chars:
+                        break
+                    part = reader.pages[i].extract_text() or ""
+                    parts.append(part)
+                    total += len(part) + 1
+                return "\n".join(parts)
+            parts = []
+            total = 0
             for page in reader.pages:
-                text += page.extract_text() + "\n"
+                # extract_text() can return None on image-only pages
+                part = page.extract_text() or ""
+                parts.append(part)
+                total += len(part) + 1
+                if max_chars is not None and total >= max_chars:
+                    break
+            return "\n".join(parts)
     except Exception as e:
         print(f"Error extracting PDF: {e}")
         return ""
-    return text
 
-def save_mcqs_to_file(mcqs_text: str, output_filepath: str):
-    """Parses AI output and appends formatted MCQs to a file."""
+def find_json_span(text: str):
+    """Scans for the first balanced top-level JSON array or object in text
+    and returns its (start, end) slice, or None if no complete value is
+    present.
+
+    A single pass tracks bracket depth while honoring string literals and
+    escapes, so brackets quoted inside questions or options do not end the
+    value early the way a bare rfind(']') would."""
+    starts = [i for i in (text.find("["), text.find("{")) if i != -1]
+    if not starts:
+        return None
+    start = min(starts)
+    depth = 0
+    in_string = False
+    escape = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if escape:
+            escape = False
+        elif in_string:
+            if ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "[{":
+            depth += 1
+        elif ch in "]}":
+            depth -= 1
+            if depth == 0:
+                return start, i + 1
+    return None
+
+def extract_json_payload(text: str) -> str:
+    """Isolates the JSON value in raw model output, falling back to stripping
+    markdown fences when no balanced value is found."""
+    span = find_json_span(text)
+    if span:
+        return text[span[0]:span[1]]
+    clean_text = text.strip()
+    if clean_text.startswith("```json"):
+        clean_text = clean_text[7:]
+    if clean_text.strip().endswith("```"):
+        clean_text = clean_text.strip()[:-3]
+    return clean_text
+
+def iter_mcqs(payload: str):
+    """Yields MCQ objects from a JSON array payload, incrementally via ijson
+    where available and from a full parse otherwise."""
+    if ijson is not None:
+        return ijson.items(io.BytesIO(payload.encode('utf-8')), 'item')
+    return iter(json_loads(payload))
+
+# Reusable per-thread format buffer so batch runs don't allocate a fresh
+# one per quiz
+_WRITE_BUF = threading.local()
+
+# One format call covers the standard 4-option question instead of four
+OPTS_TEMPLATE = "  A. {}\n  B. {}\n  C. {}\n  D. {}\n"
+
+def _write_mcqs(mcqs, output_filepath: str):
+    """Appends an iterable of MCQ objects to a file in the quiz format.
+
+    Everything is formatted into a pooled StringIO first and flushed with a
+    single write, so the file sees one append instead of several small
+    writes and a parse failure partway through leaves it untouched."""
+    buf = getattr(_WRITE_BUF, 'buf', None)
+    if buf is None:
+        buf = _WRITE_BUF.buf = io.StringIO()
+    buf.seek(0)
+    buf.truncate()
+
+    if os.path.exists(output_filepath):
+        buf.write("\n" + "="*40 + "\n")
+        buf.write("NEW GENERATION\n")
+        buf.write("="*40 + "\n\n")
+
+    for i, mcq in enumerate(mcqs):
+        buf.write(f"Question {i+1}: {mcq.get('question', 'N/A')}\n")
+        options = mcq.get('options', [])
+        if len(options) == 4:
+            buf.write(OPTS_TEMPLATE.format(*options))
+        else:
+            for j, option in enumerate(options):
+                buf.write(f"  {chr(65+j)}. {option}\n")
+        buf.write(f"Answer: {mcq.get('answer', 'N/A')}\n\n")
+
+    with open(output_filepath, 'a', encoding='utf-8') as f:
+        f.write(buf.getvalue())
+    print(f"Successfully appended MCQs to {output_filepath}")
+
+def save_mcqs_to_file(mcqs_text: str, output_filepath: str) -> bool:
+    """Parses AI output and appends formatted MCQs to a file. A JSON object
+    response is treated as one batch of difficulty tiers and split into one
+    output file per tier. Returns True when the output parsed cleanly and
+    False when only the raw text could be appended."""
     try:
-        # Clean potential markdown formatting
-        clean_text = mcqs_text.strip()
-        if clean_text.startswith("```json"):
-            clean_text = clean_text[7:]
-        if clean_text.strip().endswith("```"):
-            clean_text = clean_text.strip()[:-3]
-        
-        mcqs = json.loads(clean_text)
-        
-        file_exists = os.path.exists(output_filepath)
-        
-        with open(output_filepath, 'a', encoding='utf-8') as f:
-            if file_exists:
-                f.write("\n" + "="*40 + "\n")
-                f.write("NEW GENERATION\n")
-                f.write("="*40 + "\n\n")
-                
-            for i, mcq in enumerate(mcqs):
-                f.write(f"Question {i+1}: {mcq.get('question', 'N/A')}\n")
-                options = mcq.get('options', [])
-                for j, option in enumerate(options):
-                    f.write(f"  {chr(65+j)}. {option}\n")
-                f.write(f"Answer: {mcq.get('answer', 'N/A')}\n\n")
-        print(f"Successfully appended MCQs to {output_filepath}")
+        payload = extract_json_payload(mcqs_text)
+        if payload.lstrip().startswith("{"):
+            base, ext = os.path.splitext(output_filepath)
+            for difficulty, mcqs in json_loads(payload).items():
+                _write_mcqs(iter(mcqs), f"{base}_{difficulty}{ext}")
+        else:
+            _write_mcqs(iter_mcqs(payload), output_filepath)
+        return True
     except Exception as e:
         print(f"Error saving file: {e}. Appending raw output instead.")
         with open(output_filepath, 'a', encoding='utf-8') as f:
             f.write("\n--- RAW OUTPUT ---\n")
             f.write(mcqs_text)
             f.write("\n------------------\n")
+        return False
 
 # Disable tracing to avoid errors with non-OpenAI keys
 set_tracing_disabled(True)
@@ -78,64 +317,258 @@ openrouter_client = AsyncOpenAI(
 )
 
 # 3. Initialize the model using the client
-openrouter_model = OpenAIChatCompletionsModel(
-    model="google/gemini-2.0-flash-001",
-    openai_client=openrouter_client
-)
+MODEL_NAME = "google/gemini-2.0-flash-001"
+
+@lru_cache(maxsize=8)
+def get_model(model_name: str) -> OpenAIChatCompletionsModel:
+    """Returns one shared model instance per model name. All instances reuse
+    the single AsyncOpenAI client, so HTTP connections pool across calls."""
+    return OpenAIChatCompletionsModel(
+        model=model_name,
+        openai_client=openrouter_client
+    )
+
+openrouter_model = get_model(MODEL_NAME)
+
+# Persistent cache of raw model responses, shared with the API server
+response_cache = ResponseCache()
 
-# Define the agent
+# Canonical output exemplar. It lives in the static instructions rather
+# than the per-call prompt, so it is part of the cacheable prefix and is
+# never re-sent as user tokens.
+FEW_SHOT_EXAMPLE = """[
+      {
+        "question": "What is the powerhouse of the cell?",
+        "options": ["Nucleus", "Mitochondrion", "Ribosome", "Golgi apparatus"],
+        "answer": "Mitochondrion",
+        "explanation": "Mitochondria produce most of the cell's ATP."
+      }
+    ]"""
+
+# Define the agent. The instructions are deliberately static (the question
+# count lives in the user message) so every request shares a byte-identical
+# prefix and the provider can serve it from its prompt cache.
 mcq_agent = Agent(
     name="MCQ Generator",
-    instructions="""You are an expert quiz creator. 
-    Your task is to generate exactly {num_questions} MCQs from the provided CONTEXT. 
+    instructions="""You are an expert quiz creator.
+    Your task is to generate exactly the number of MCQs requested in the user message from the provided CONTEXT.
     Ensure the questions are accurate and directly based on the context.
-    Return ONLY a valid JSON array of objects.
+    Return ONLY valid JSON in exactly the shape requested in the user message (a single array of MCQ objects unless told otherwise).
     Each object must have: 'question', 'options' (list of 4 strings), 'answer' (string), and 'explanation' (a short sentence explaining the answer).
-    Do not include any explanation or markdown outside the JSON.""",
+    Do not include any explanation or markdown outside the JSON.
+    A one-question array looks exactly like this:
+    """ + FEW_SHOT_EXAMPLE,
     model=openrouter_model
 )
 
 # --- STEP 4: MAIN LOGIC ---
-def main():
-    parser = argparse.ArgumentParser(description="Generate MCQs from a chapter using Agents SDK.")
-    parser.add_argument("chapter_filepath", type=str, help="Path to the text or PDF file.")
-    parser.add_argument("--output", "-o", type=str, default="generated_mcqs.txt", help="Output file.")
-    parser.add_argument("--difficulty", "-d", type=str, default="medium", 
-                        choices=["easy", "medium", "hard"], help="Difficulty level.")
-    args = parser.parse_args()
 
-    if not os.path.exists(args.chapter_filepath):
-        print(f"Error: File not found: {args.chapter_filepath}")
-        return
+# Upper bound on simultaneous model calls so batch runs stay inside the
+# provider's rate limit
+MAX_CONCURRENT_GENERATIONS = 5
+
+# Static prompt segments, built once so batch runs only pay for joining the
+# variable pieces. Interned difficulty tokens keep the prompt bytes
+# identical across calls at the same settings, which also helps the
+# provider's prompt cache.
+PROMPT_HEAD = "Generate exactly 5 MCQs.\nDifficulty: "
+PROMPT_MID = "\n\nText: "
+PROMPT_HEAD_ALL = ('Generate exactly 5 MCQs for each of the difficulty tiers '
+                   'easy, medium and hard.\nReturn ONLY a JSON object mapping '
+                   '"easy", "medium" and "hard" to arrays of MCQ objects.'
+                   '\n\nText: ')
+DIFFICULTY_TOKENS = {"easy": "easy", "medium": "medium", "hard": "hard"}
+
+def build_prompt(difficulty: str, content: str) -> str:
+    if difficulty == "all":
+        # One call covers every tier; the response is split client-side
+        return "".join((PROMPT_HEAD_ALL, content[:PROMPT_CHAR_BUDGET]))
+    return "".join((PROMPT_HEAD, DIFFICULTY_TOKENS.get(difficulty, difficulty),
+                    PROMPT_MID, content[:PROMPT_CHAR_BUDGET]))
+
+def read_chapter_text(chapter_filepath: str, parallel: bool = False):
+    """Reads chapter text from a PDF or TXT file. Returns None on failure."""
+    if not os.path.exists(chapter_filepath):
+        print(f"Error: File not found: {chapter_filepath}")
+        return None
+
+    ext = os.path.splitext(chapter_filepath)[1].lower()
 
-    content = ""
-    ext = os.path.splitext(args.chapter_filepath)[1].lower()
-    
     if ext == ".pdf":
-        print(f"Extracting text from PDF...")
-        content = extract_text_from_pdf(args.chapter_filepath)
+        print(f"Extracting text from {chapter_filepath}...")
+        # A generous multiple of the prompt budget so the cap never cuts off
+        # text that would have made it into the prompt after cleanup
+        content = extract_text_from_pdf(chapter_filepath, parallel=parallel,
+                                        max_chars=PROMPT_CHAR_BUDGET * 4)
     elif ext == ".txt":
-        with open(args.chapter_filepath, 'r', encoding='utf-8') as f:
+        with open(chapter_filepath, 'r', encoding='utf-8') as f:
             content = f.read()
     else:
         print(f"Unsupported file type: {ext}")
+        return None
+
+    if is_blank(content):
+        print(f"No content found in {chapter_filepath}.")
+        return None
+    return content
+
+async def run_agent_streamed(agent, prompt: str) -> str:
+    """Runs the agent with a streamed response, accumulating text chunks as
+    they arrive. A small bracket tracker (string- and escape-aware, since
+    each MCQ nests an options array) detects when the top-level JSON value
+    closes, so the run stops without waiting for any trailing output."""
+    result = Runner.run_streamed(agent, prompt)
+    buf = []
+    depth = 0
+    in_string = False
+    escape = False
+    started = False
+    complete = False
+
+    async for event in result.stream_events():
+        delta = getattr(getattr(event, "data", None), "delta", None)
+        if event.type != "raw_response_event" or not isinstance(delta, str):
+            continue
+        buf.append(delta)
+        for ch in delta:
+            if escape:
+                escape = False
+            elif in_string:
+                if ch == "\\":
+                    escape = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch in "[{":
+                depth += 1
+                started = True
+            elif ch in "]}":
+                depth -= 1
+                if started and depth <= 0:
+                    complete = True
+                    break
+        if complete:
+            break
+
+    if complete:
+        try:
+            result.cancel()
+        except Exception:
+            pass
+        return "".join(buf)
+    # Stream ended without a complete JSON value; trust the final output
+    return result.final_output or "".join(buf)
+
+async def generate_one(chapter_filepath: str, difficulty: str, output_filepath: str,
+                       parallel: bool = False, semaphore: asyncio.Semaphore = None):
+    """Generates MCQs for a single chapter file and appends them to the output."""
+    content = read_chapter_text(chapter_filepath, parallel=parallel)
+    if content is None:
         return
-    
-    if not content.strip():
-        print("No content found in file.")
+
+    # Check the response cache before paying for a model call
+    cached = response_cache.get(MODEL_NAME, difficulty, content)
+    if cached:
+        print(f"Found cached MCQs for {chapter_filepath}, skipping the model call.")
+        if not save_mcqs_to_file(cached, output_filepath):
+            # The entry does not parse; evict it so the next run regenerates
+            response_cache.delete(MODEL_NAME, difficulty, content)
         return
 
-    # Pass text and difficulty to the agent
-    mcq_agent.instructions = mcq_agent.instructions.format(num_questions=5) # Default to 5 in standalone
-    prompt = f"Difficulty: {args.difficulty}\n\nText: {content[:8000]}"
-    
-    print(f"Generating {args.difficulty} difficulty MCQs via Agent...")
-    result = Runner.run_sync(mcq_agent, prompt)
-    
-    if result and result.final_output:
-        save_mcqs_to_file(result.final_output, args.output)
+    # Pass text and difficulty to the agent; the variable chapter text goes
+    # last so the stable part of the request stays cacheable
+    prompt = build_prompt(difficulty, content)
+
+    print(f"Generating {difficulty} difficulty MCQs for {chapter_filepath} via Agent...")
+    if semaphore is not None:
+        async with semaphore:
+            output = await run_agent_streamed(mcq_agent, prompt)
     else:
-        print("Failed to generate MCQs.")
+        output = await run_agent_streamed(mcq_agent, prompt)
+
+    if output:
+        # Only responses that parsed cleanly are worth replaying later
+        if save_mcqs_to_file(output, output_filepath):
+            response_cache.put(MODEL_NAME, difficulty, content, output)
+    else:
+        print(f"Failed to generate MCQs for {chapter_filepath}.")
+
+async def generate_many(chapter_filepaths, difficulty: str, output_filepath: str,
+                        parallel: bool = False):
+    """Generates MCQs for several chapters concurrently. Wall time is bounded
+    by the slowest chapter rather than the sum of all round trips."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_GENERATIONS)
+    tasks = [
+        generate_one(path, difficulty, output_filepath, parallel=parallel, semaphore=semaphore)
+        for path in chapter_filepaths
+    ]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    for path, outcome in zip(chapter_filepaths, results):
+        if isinstance(outcome, Exception):
+            print(f"Error processing {path}: {outcome}")
+
+async def serve(socket_path: str):
+    """Runs a persistent daemon on a Unix socket. Each connection sends one
+    line of JSON ({"path": ..., "difficulty": ..., "output": ...}) and gets
+    back a one-line status. Repeated jobs reuse the warm agent, the response
+    cache and the PDF text cache instead of paying interpreter and SDK
+    startup per chapter."""
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    async def handle(reader, writer):
+        try:
+            line = await reader.readline()
+            request = json_loads(line) if line.strip() else {}
+            path = request.get("path")
+            if not path:
+                writer.write(b'{"status": "error", "detail": "missing path"}\n')
+            else:
+                await generate_one(
+                    path,
+                    request.get("difficulty", "medium"),
+                    request.get("output", "generated_mcqs.txt"),
+                    parallel=bool(request.get("parallel", False)),
+                )
+                writer.write(b'{"status": "ok"}\n')
+        except Exception as e:
+            detail = json.dumps({"status": "error", "detail": str(e)})
+            writer.write(detail.encode("utf-8") + b"\n")
+        finally:
+            await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+
+    server = await asyncio.start_unix_server(handle, path=socket_path)
+    print(f"Serving MCQ generation requests on {socket_path}")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate MCQs from a chapter using Agents SDK.")
+    parser.add_argument("chapter_filepaths", type=str, nargs="*",
+                        help="Path(s) to the text or PDF file(s).")
+    parser.add_argument("--output", "-o", type=str, default="generated_mcqs.txt", help="Output file.")
+    parser.add_argument("--difficulty", "-d", type=str, default="medium",
+                        choices=["easy", "medium", "hard", "all"],
+                        help="Difficulty level; 'all' generates every tier in one call.")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Extract PDF pages in parallel across CPU cores "
+                             "(applies to the PyPDF2 engine; native extractors "
+                             "are fast enough sequentially).")
+    parser.add_argument("--serve", type=str, metavar="SOCKET",
+                        help="Run as a daemon accepting JSON requests on this Unix socket.")
+    args = parser.parse_args()
+
+    if args.serve:
+        asyncio.run(serve(args.serve))
+        return
+    if not args.chapter_filepaths:
+        parser.error("chapter_filepaths is required unless --serve is given")
+
+    asyncio.run(generate_many(args.chapter_filepaths, args.difficulty, args.output,
+                              parallel=args.parallel))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,209 @@
+import os
+import json
+import hashlib
+import sqlite3
+from datetime import datetime
+
+# Numba compiles the SimHash kernel to native code (roughly an order of
+# magnitude faster on 8 KB of text); the pure-Python fallback computes the
+# exact same hash, so cache entries stay comparable either way.
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    np = None
+    njit = None
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mcq_gen")
+CACHE_DB_PATH = os.path.join(CACHE_DIR, "cache.sqlite")
+
+# Maximum Hamming distance between SimHashes for two texts to count as
+# "the same chapter" (near-duplicate uploads, re-exported PDFs, etc.).
+MAX_HAMMING_DISTANCE = 6
+
+
+def normalize_text(text: str) -> str:
+    """Lowercases and collapses all whitespace runs to single spaces."""
+    return " ".join(text.lower().split())
+
+
+# SimHash kernel parameters: FNV-1a over an 8-byte rolling window, with
+# sign-bit voting across 64 lanes
+_FNV_OFFSET = 0xcbf29ce484222325
+_FNV_PRIME = 0x100000001b3
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+_WINDOW = 8
+
+
+def _simhash_kernel_py(data: bytes) -> int:
+    lanes = [0] * 64
+    n = len(data)
+    window = _WINDOW if n >= _WINDOW else n
+    for i in range(n - window + 1):
+        h = _FNV_OFFSET
+        for j in range(i, i + window):
+            h = ((h ^ data[j]) * _FNV_PRIME) & _MASK64
+        for bit in range(64):
+            if (h >> bit) & 1:
+                lanes[bit] += 1
+            else:
+                lanes[bit] -= 1
+    result = 0
+    for bit in range(64):
+        if lanes[bit] > 0:
+            result |= 1 << bit
+    return result
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _simhash_kernel_numba(buf):
+        lanes = np.zeros(64, dtype=np.int64)
+        n = buf.shape[0]
+        window = 8 if n >= 8 else n
+        for i in range(n - window + 1):
+            h = np.uint64(0xcbf29ce484222325)
+            for j in range(i, i + window):
+                h = (h ^ np.uint64(buf[j])) * np.uint64(0x100000001b3)
+            for bit in range(64):
+                if (h >> np.uint64(bit)) & np.uint64(1):
+                    lanes[bit] += 1
+                else:
+                    lanes[bit] -= 1
+        result = np.uint64(0)
+        for bit in range(64):
+            if lanes[bit] > 0:
+                result |= np.uint64(1) << np.uint64(bit)
+        return result
+
+
+def simhash64(text: str) -> int:
+    """Computes a 64-bit SimHash over byte shingles of the normalized text.
+
+    Near-identical texts produce hashes within a small Hamming distance of
+    each other, which lets the cache match re-uploads of the same chapter
+    even when headers, page numbers or whitespace differ slightly.
+    """
+    data = normalize_text(text).encode("utf-8")
+    if not data:
+        return 0
+    if njit is not None:
+        return int(_simhash_kernel_numba(np.frombuffer(data, dtype=np.uint8)))
+    return _simhash_kernel_py(data)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class ResponseCache:
+    """Persistent cache of raw model responses keyed by chapter text.
+
+    Exact hits are looked up by a blake2b digest of the (truncated) chapter
+    text plus difficulty, model name and question count. Semantic hits are
+    found by comparing 64-bit SimHashes of the normalized text; any entry
+    within MAX_HAMMING_DISTANCE for the same settings is returned. A linear
+    scan over candidates is plenty at this cache's scale.
+    """
+
+    def __init__(self, db_path: str = CACHE_DB_PATH):
+        self.db_path = db_path
+        try:
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS responses (
+                        key TEXT PRIMARY KEY,
+                        model TEXT NOT NULL,
+                        difficulty TEXT NOT NULL,
+                        num_questions INTEGER NOT NULL,
+                        simhash TEXT NOT NULL,
+                        response TEXT NOT NULL,
+                        created_at TEXT NOT NULL
+                    )
+                    """
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_responses_settings "
+                    "ON responses (model, difficulty, num_questions)"
+                )
+        except Exception as e:
+            print(f"Warning: could not initialize response cache: {e}")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path)
+
+    def _exact_key(self, model: str, difficulty: str, num_questions: int, text: str) -> str:
+        digest = hashlib.blake2b(text[:8000].encode("utf-8")).hexdigest()
+        return f"{digest}|{difficulty}|{model}|{num_questions}"
+
+    def get(self, model: str, difficulty: str, text: str, num_questions: int = 5):
+        """Returns a previously cached raw response, or None on a miss."""
+        try:
+            key = self._exact_key(model, difficulty, num_questions, text)
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT response FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row:
+                    return row[0]
+
+                # No exact hit: look for a near-duplicate of the same settings.
+                target = simhash64(text[:8000])
+                candidates = conn.execute(
+                    "SELECT simhash, response FROM responses "
+                    "WHERE model = ? AND difficulty = ? AND num_questions = ?",
+                    (model, difficulty, num_questions),
+                ).fetchall()
+            for candidate_hash, response in candidates:
+                if hamming_distance(target, int(candidate_hash, 16)) <= MAX_HAMMING_DISTANCE:
+                    return response
+        except Exception as e:
+            print(f"Warning: response cache lookup failed: {e}")
+        return None
+
+    def delete(self, model: str, difficulty: str, text: str, num_questions: int = 5):
+        """Removes any entry this text would hit, exact or semantic, so a
+        response that turned out to be unusable is not served again."""
+        try:
+            key = self._exact_key(model, difficulty, num_questions, text)
+            target = simhash64(text[:8000])
+            with self._connect() as conn:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                candidates = conn.execute(
+                    "SELECT key, simhash FROM responses "
+                    "WHERE model = ? AND difficulty = ? AND num_questions = ?",
+                    (model, difficulty, num_questions),
+                ).fetchall()
+                stale = [
+                    (candidate_key,)
+                    for candidate_key, candidate_hash in candidates
+                    if hamming_distance(target, int(candidate_hash, 16)) <= MAX_HAMMING_DISTANCE
+                ]
+                if stale:
+                    conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+        except Exception as e:
+            print(f"Warning: could not delete cache entry: {e}")
+
+    def put(self, model: str, difficulty: str, text: str, response: str, num_questions: int = 5):
+        """Stores a raw model response for later reuse."""
+        try:
+            key = self._exact_key(model, difficulty, num_questions, text)
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(key, model, difficulty, num_questions, simhash, response, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        model,
+                        difficulty,
+                        num_questions,
+                        f"{simhash64(text[:8000]):016x}",
+                        response,
+                        datetime.utcnow().isoformat(),
+                    ),
+                )
+        except Exception as e:
+            print(f"Warning: could not store response in cache: {e}")